@@ -3,7 +3,13 @@ __all__ = [
     "downloader",
     "transcriber",
     "chunker",
+    "extractive",
     "summarizer",
+    "api_client",
+    "models",
+    "daemon",
+    "index",
+    "checkpoint",
 ]
 
 
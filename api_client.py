@@ -0,0 +1,268 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+
+from config import Settings, load_settings
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously up to ``capacity``."""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self._level = float(capacity)
+        self._stamp = time.monotonic()
+        self._cond = threading.Condition()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._stamp) * self.refill_per_second)
+        self._stamp = now
+
+    def acquire(self, amount: float) -> None:
+        # Requests larger than the bucket would never fit; let them through on a full bucket
+        amount = min(float(amount), self.capacity)
+        with self._cond:
+            while True:
+                self._refill()
+                if self._level >= amount:
+                    self._level -= amount
+                    return
+                self._cond.wait((amount - self._level) / self.refill_per_second)
+
+    def adjust(self, amount: float) -> None:
+        """Return (positive) or charge (negative) tokens after the real cost is known."""
+        with self._cond:
+            self._refill()
+            self._level = min(self.capacity, self._level + amount)
+            self._cond.notify_all()
+
+    def drain(self) -> None:
+        with self._cond:
+            self._refill()
+            self._level = min(self._level, 0.0)
+
+
+class CircuitBreaker:
+    """Stops calls for ``reset_timeout`` after repeated server failures.
+
+    Once the timeout has passed a single probe call is let through; its
+    outcome closes or re-opens the circuit while other callers wait.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, probe_poll: float = 0.5):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe_poll = probe_poll
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> Optional[float]:
+        """Return None if the call may proceed, else seconds to wait before asking again."""
+        with self._lock:
+            if self._opened_at is None:
+                return None
+            remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+            if remaining > 0:
+                return remaining
+            if self._probing:
+                return self.probe_poll
+            self._probing = True
+            return None
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def release(self) -> None:
+        """End a probe whose outcome says nothing about server health (4xx, throttling)."""
+        with self._lock:
+            self._probing = False
+
+
+def _status_code(exc: Exception) -> Optional[int]:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000.0
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+class RateGovernor:
+    """Process-wide limiter every API call goes through.
+
+    Calls wait for both a request and a token budget (per minute), back off
+    on 429/5xx honouring Retry-After, and wait while the circuit is open.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        retries: int = 4,
+        backoff: float = 1.5,
+        max_backoff: float = 60.0,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker or CircuitBreaker()
+        self._paused_until = 0.0
+        self._pause_lock = threading.Lock()
+
+    def _wait_for_pause(self) -> None:
+        while True:
+            with self._pause_lock:
+                delay = self._paused_until - time.monotonic()
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    def _pause(self, seconds: float) -> None:
+        # A 429 means the quota is spent for everyone, not only this caller
+        with self._pause_lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self.requests.drain()
+
+    def _wait_for_circuit(self) -> None:
+        while True:
+            delay = self.breaker.before_call()
+            if delay is None:
+                return
+            time.sleep(delay)
+
+    def call(self, fn: Callable[[], Any], estimated_tokens: int = 0) -> Any:
+        err: Optional[Exception] = None
+        for attempt in range(self.retries):
+            self._wait_for_circuit()
+            self._wait_for_pause()
+            self.requests.acquire(1)
+            self.tokens.acquire(estimated_tokens)
+            try:
+                resp = fn()
+            except Exception as exc:
+                err = exc
+                status = _status_code(exc)
+                throttled = status in (408, 409, 429)
+                if status is not None and status < 500 and not throttled:
+                    self.breaker.release()
+                    raise  # client errors will not succeed on retry
+                # throttling is handled by pausing; only server and connection
+                # errors count towards opening the circuit
+                if throttled:
+                    self.breaker.release()
+                else:
+                    self.breaker.record_failure()
+                if attempt == self.retries - 1:
+                    break  # no point waiting before giving up
+                delay = _retry_after(exc)
+                if delay is None:
+                    delay = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.0)
+                # a bogus Retry-After must not freeze every caller in the process
+                delay = min(delay, self.max_backoff)
+                if status == 429:
+                    self._pause(delay)
+                else:
+                    time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            used = getattr(getattr(resp, "usage", None), "total_tokens", None)
+            if isinstance(used, int):
+                self.tokens.adjust(estimated_tokens - used)
+            return resp
+        if err:
+            raise err
+        raise RuntimeError("Retry failed without exception")
+
+
+_clients: Dict[Optional[str], Any] = {}
+_governor: Optional[RateGovernor] = None
+_lock = threading.Lock()
+
+
+def configure(settings: Settings) -> RateGovernor:
+    global _governor
+    with _lock:
+        # Keep the existing buckets when limits are unchanged so concurrent runs share them
+        if (
+            _governor is None
+            or _governor.requests.capacity != settings.api_requests_per_minute
+            or _governor.tokens.capacity != settings.api_tokens_per_minute
+        ):
+            _governor = RateGovernor(settings.api_requests_per_minute, settings.api_tokens_per_minute)
+        return _governor
+
+
+def get_governor() -> RateGovernor:
+    with _lock:
+        governor = _governor
+    return governor or configure(load_settings())
+
+
+def get_client(api_key: Optional[str] = None, max_connections: Optional[int] = None) -> Any:
+    """Shared OpenAI client with a keep-alive connection pool.
+
+    The SDK's own retries are disabled; ``RateGovernor.call`` handles them.
+    """
+    with _lock:
+        if api_key in _clients:
+            return _clients[api_key]
+        try:
+            import httpx
+            from openai import OpenAI
+        except Exception as exc:
+            raise RuntimeError("openai package not installed. pip install openai") from exc
+        if max_connections is None:
+            max_connections = load_settings().api_max_connections
+        http_client = httpx.Client(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(120.0, connect=10.0),
+        )
+        kwargs: Dict[str, Any] = {"http_client": http_client, "max_retries": 0}
+        if api_key:
+            kwargs["api_key"] = api_key
+        _clients[api_key] = OpenAI(**kwargs)
+        return _clients[api_key]
+
+
+def governed_call(fn: Callable[[], Any], estimated_tokens: int = 0) -> Any:
+    return get_governor().call(fn, estimated_tokens)
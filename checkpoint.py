@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import re
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional, Type, TypeVar
+
+from downloader import window_suffix
+
+T = TypeVar("T")
+
+_VIDEO_ID_RE = re.compile(r"(?:v=|youtu\.be/|shorts/|live/|embed/)([A-Za-z0-9_-]{6,})")
+
+
+def run_key(url: str, start: Optional[float] = None, end: Optional[float] = None) -> str:
+    """Journal name for a run: the video id when the URL has one, plus the window."""
+    match = _VIDEO_ID_RE.search(url)
+    key = match.group(1) if match else hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+    return key + window_suffix(start, end)
+
+
+class CheckpointJournal:
+    """Append-only journal of completed pipeline stages for one run.
+
+    Every record is a single JSON line written with one ``write`` and
+    fsynced before the stage is considered done, so a crash can at worst
+    leave a torn last line, which is discarded on the next open.
+    """
+
+    def __init__(self, path: str, fingerprint: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self._stages: Dict[str, Any] = {}
+        self._chapters: Dict[int, Dict[str, Any]] = {}
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._load()
+        # The header holds the options the stored outputs were produced with;
+        # a journal written with different ones cannot be resumed.
+        if fingerprint is not None and self._stages.get("header") != fingerprint:
+            self.clear()
+            self._stages = {}
+            self._chapters = {}
+            self._append({"stage": "header", "data": fingerprint})
+
+    @classmethod
+    def for_run(
+        cls,
+        output_dir: str,
+        url: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        fingerprint: Optional[Dict[str, Any]] = None,
+    ) -> "CheckpointJournal":
+        return cls(os.path.join(output_dir, ".checkpoints", f"{run_key(url, start, end)}.jsonl"), fingerprint)
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        good_bytes = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line.decode("utf-8"))
+                except ValueError:
+                    break
+                self._apply(record)
+                good_bytes += len(line)
+        # drop a torn tail so later appends start on a clean line
+        if good_bytes < os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(good_bytes)
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        if record["stage"] == "chapter":
+            self._chapters[record["index"]] = record["data"]
+        else:
+            self._stages[record["stage"]] = record["data"]
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, line)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        self._apply(record)
+
+    def compact(self) -> None:
+        """Rewrite the journal from the current state, dropping superseded records."""
+        records = [{"stage": stage, "data": data} for stage, data in self._stages.items()]
+        records += [{"stage": "chapter", "index": idx, "data": data} for idx, data in self._chapters.items()]
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            for record in records:
+                f.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def record(self, stage: str, value: Any) -> None:
+        if isinstance(value, list):
+            data: Any = [asdict(v) for v in value]
+        else:
+            data = asdict(value)
+        self._append({"stage": stage, "data": data})
+
+    def load(self, stage: str, cls: Type[T]) -> Optional[T]:
+        data = self._stages.get(stage)
+        return cls(**data) if data is not None else None
+
+    def load_list(self, stage: str, cls: Type[T]) -> Optional[List[T]]:
+        data = self._stages.get(stage)
+        return [cls(**d) for d in data] if data is not None else None
+
+    def record_chapter(self, index: int, chapter: Any) -> None:
+        self._append({"stage": "chapter", "index": index, "data": asdict(chapter)})
+
+    def has_chapter(self, index: int) -> bool:
+        return index in self._chapters
+
+    def chapters(self, cls: Callable[..., T]) -> Dict[int, T]:
+        return {idx: cls(**data) for idx, data in self._chapters.items()}
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dataclasses import dataclass
 from typing import Optional
 
@@ -7,12 +8,18 @@ from typing import Optional
 class Settings:
     huggingface_api_key: Optional[str]
     huggingface_model: str
+    summarizer_backend: str  # "huggingface" or "openai"
     transcription_backend: str  # "huggingface" or "whisper_local" or "auto"
     transcription_model: str
     max_chunk_tokens: int
     chunk_max_seconds: int
     chunk_gap_seconds: float
+    summary_input_tokens: int
     output_dir: str
+    daemon_socket: str
+    api_requests_per_minute: int
+    api_tokens_per_minute: int
+    api_max_connections: int
 
 
 def load_settings() -> Settings:
@@ -26,12 +33,18 @@ def load_settings() -> Settings:
     return Settings(
         huggingface_api_key=os.getenv("HUGGINGFACE_API_KEY"),
         huggingface_model=os.getenv("HUGGINGFACE_MODEL", "facebook/bart-large-cnn"),
+        summarizer_backend=os.getenv("SUMMARIZER_BACKEND", "huggingface"),
         transcription_backend=os.getenv("TRANSCRIPTION_BACKEND", "huggingface"),
         transcription_model=os.getenv("TRANSCRIPTION_MODEL", "openai/whisper-large"),
         max_chunk_tokens=int(os.getenv("MAX_CHUNK_TOKENS", "800")),
         chunk_max_seconds=int(os.getenv("CHUNK_MAX_SECONDS", "480")),
         chunk_gap_seconds=float(os.getenv("CHUNK_GAP_SECONDS", "2.0")),
+        summary_input_tokens=int(os.getenv("SUMMARY_INPUT_TOKENS", "384")),
         output_dir=os.getenv("OUTPUT_DIR", os.path.abspath("outputs")),
+        daemon_socket=os.getenv("DAEMON_SOCKET", os.path.join(tempfile.gettempdir(), "youtube-summarizer.sock")),
+        api_requests_per_minute=int(os.getenv("API_REQUESTS_PER_MINUTE", "60")),
+        api_tokens_per_minute=int(os.getenv("API_TOKENS_PER_MINUTE", "90000")),
+        api_max_connections=int(os.getenv("API_MAX_CONNECTIONS", "20")),
     )
 
 
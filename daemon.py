@@ -0,0 +1,135 @@
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import threading
+from typing import Any, Dict, Optional
+
+from config import Settings, load_settings
+from models import get_pipeline
+
+
+def _warm_up(settings: Settings) -> None:
+    # Best-effort: a missing optional backend should not keep the daemon down
+    try:
+        get_pipeline("summarization", settings.huggingface_model)
+    except Exception as exc:
+        print(f"Summarization model not preloaded: {exc}")
+
+
+# Seconds a client may take to send its request line
+REQUEST_TIMEOUT = 10.0
+CONNECT_TIMEOUT = 2.0
+
+# Jobs run one at a time: loaded models are shared and not safe to call
+# concurrently. Connections are threaded so a stalled client or a long job
+# never blocks other clients from being answered.
+_job_lock = threading.Lock()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    timeout = REQUEST_TIMEOUT
+
+    def handle(self) -> None:
+        from main import run  # imported lazily: main imports this module
+
+        settings: Settings = self.server.settings  # type: ignore[attr-defined]
+        try:
+            line = self.rfile.readline()
+        except OSError:  # client stalled before finishing its request
+            return
+        if not line:  # liveness probe
+            return
+        try:
+            request = json.loads(line.decode("utf-8"))
+        except ValueError as exc:
+            self._reply({"ok": False, "error": f"Invalid request: {exc}"})
+            return
+        if not _job_lock.acquire(blocking=bool(request.get("wait"))):
+            self._reply({"ok": False, "busy": True})
+            return
+        try:
+            captured = io.StringIO()
+            with contextlib.redirect_stdout(captured):
+                run(
+                    request["url"],
+                    request.get("json_out"),
+                    request.get("md_out"),
+                    request.get("language"),
+                    settings=settings,
+                    start=request.get("start"),
+                    end=request.get("end"),
+                )
+            response: Dict[str, Any] = {"ok": True, "output": captured.getvalue()}
+        except Exception as exc:
+            response = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+        finally:
+            _job_lock.release()
+        self._reply(response)
+
+    def _reply(self, response: Dict[str, Any]) -> None:
+        with contextlib.suppress(OSError):
+            self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(socket_path: Optional[str] = None) -> None:
+    if not hasattr(socket, "AF_UNIX"):
+        raise RuntimeError("Daemon mode requires unix domain sockets, which this platform does not support")
+
+    settings = load_settings()
+    path = socket_path or settings.daemon_socket
+    if os.path.exists(path):
+        if request({"ping": True}, path) is not None:
+            raise RuntimeError(f"A daemon is already listening on {path}")
+        os.unlink(path)  # stale socket left by a crashed daemon
+
+    os.makedirs(settings.output_dir, exist_ok=True)
+    _warm_up(settings)
+
+    with _Server(path, _Handler) as server:
+        server.settings = settings  # type: ignore[attr-defined]
+        os.chmod(path, 0o600)
+        print(f"Daemon listening on {path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            with contextlib.suppress(OSError):
+                os.unlink(path)
+
+
+def request(payload: Dict[str, Any], socket_path: str) -> Optional[Dict[str, Any]]:
+    """Send ``payload`` to a running daemon.
+
+    Returns None if no daemon is reachable or it is busy with another job
+    (unless the payload sets ``wait``), so the caller can run in-process.
+    """
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            return None
+        if payload.get("ping"):
+            return {"ok": True}
+        sock.sendall((json.dumps(payload) + "\n").encode("utf-8"))
+        # the daemon answers "busy" at once; otherwise the reply comes when the job ends
+        sock.settimeout(None)
+        with sock.makefile("rb") as f:
+            line = f.readline()
+        if not line:
+            raise RuntimeError("Daemon closed the connection without a response")
+        response = json.loads(line.decode("utf-8"))
+        return None if response.get("busy") else response
+    finally:
+        sock.close()
@@ -1,4 +1,5 @@
 import json
+import math
 import os
 import subprocess
 import tempfile
@@ -14,13 +15,79 @@ class VideoMetadata:
     description: Optional[str]
     audio_path: str
     transcript_events: List[Dict]
+    # start of the downloaded audio within the video; audio timestamps are relative to it
+    audio_offset_seconds: float = 0.0
+    # end of the requested window within the video; None when it runs to the end
+    window_end_seconds: Optional[float] = None
 
 
 def _run(cmd: List[str]) -> subprocess.CompletedProcess:
     return subprocess.run(cmd, capture_output=True, text=True, check=True)
 
 
-def fetch_with_ytdlp(video_url: str, preferred_lang: str = "en") -> VideoMetadata:
+def parse_timestamp(value: str) -> float:
+    """Parse "SS", "MM:SS" or "HH:MM:SS" (fractions allowed) into seconds."""
+    parts = value.strip().split(":")
+    if not value.strip() or len(parts) > 3:
+        raise ValueError(f"Invalid timestamp: {value!r}")
+    seconds = 0.0
+    for i, part in enumerate(parts):
+        field = float(part)
+        # the leading field is unbounded; minutes and seconds after a colon are < 60
+        if not math.isfinite(field) or field < 0 or (i > 0 and field >= 60):
+            raise ValueError(f"Invalid timestamp: {value!r}")
+        seconds = seconds * 60 + field
+    return seconds
+
+
+def window_suffix(start: Optional[float], end: Optional[float]) -> str:
+    """Name suffix for a time window, e.g. ".90.5-end"; empty for the whole video."""
+    if start is None and end is None:
+        return ""
+
+    def fmt(ts: float) -> str:
+        return f"{ts:.3f}".rstrip("0").rstrip(".")
+
+    return f".{fmt(start or 0.0)}-{fmt(end) if end is not None else 'end'}"
+
+
+def _events_in_window(events: List[Dict], start: float, end: Optional[float]) -> List[Dict]:
+    # Clip at word level: an event overlapping a boundary keeps only the
+    # segs whose absolute time (tStartMs + tOffsetMs) lies in [start, end).
+    start_ms = start * 1000.0
+    end_ms = end * 1000.0 if end is not None else float("inf")
+    kept: List[Dict] = []
+    for ev in events:
+        ev_start = float(ev.get("tStartMs", 0))
+        ev_end = ev_start + float(ev.get("dDurationMs", 0))
+        if ev_end < start_ms or ev_start >= end_ms:
+            continue
+        if "segs" not in ev:
+            kept.append(ev)
+            continue
+        segs = [seg for seg in ev["segs"] if start_ms <= ev_start + float(seg.get("tOffsetMs", 0)) < end_ms]
+        if segs:
+            kept.append(dict(ev, segs=segs))
+    return kept
+
+
+def fetch_with_ytdlp(
+    video_url: str,
+    preferred_lang: str = "en",
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+) -> VideoMetadata:
+    """Fetch metadata, audio and captions; ``start``/``end`` (seconds) limit
+    the audio download and captions to that section of the video."""
+    if start is not None and end is not None and end <= start:
+        raise ValueError("end must be after start")
+    windowed = start is not None or end is not None
+    section: List[str] = []
+    if windowed:
+        # yt-dlp fetches only the byte ranges covering the section
+        section_end = f"{end:.3f}" if end is not None else "inf"
+        section = ["--download-sections", f"*{start or 0:.3f}-{section_end}", "--force-keyframes-at-cuts"]
+
     try:
         _run(["yt-dlp", "--version"])  # ensure available
     except Exception as exc:
@@ -65,6 +132,7 @@ def fetch_with_ytdlp(video_url: str, preferred_lang: str = "en") -> VideoMetadat
         "--audio-format", "m4a",
         "--extractor-args", "youtube:player_client=android,web",
         "--user-agent", "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+        *section,
         "-o", audio_out,
         video_url,
     ]
@@ -78,6 +146,7 @@ def fetch_with_ytdlp(video_url: str, preferred_lang: str = "en") -> VideoMetadat
             "-x",
             "--audio-format", "m4a",
             "--extractor-args", "youtube:player_client=android",
+            *section,
             "-o", audio_out,
             video_url,
         ]
@@ -112,6 +181,8 @@ def fetch_with_ytdlp(video_url: str, preferred_lang: str = "en") -> VideoMetadat
         with open(sub_file, "r", encoding="utf-8") as f:
             data = json.load(f)
             transcript_events = data.get("events", []) or []
+    if windowed:
+        transcript_events = _events_in_window(transcript_events, start or 0.0, end)
 
     return VideoMetadata(
         video_id=video_id,
@@ -120,6 +191,8 @@ def fetch_with_ytdlp(video_url: str, preferred_lang: str = "en") -> VideoMetadat
         description=description,
         audio_path=audio_out,
         transcript_events=transcript_events,
+        audio_offset_seconds=start or 0.0,
+        window_end_seconds=end,
     )
 
 
@@ -0,0 +1,122 @@
+import re
+from typing import List
+
+from chunker import Chunk, _estimate_tokens
+
+
+_SENTENCE_RE = re.compile(r"[^.!?。！？]+(?:[.!?。！？]+|$)")
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+# Auto captions carry little punctuation; longer runs are ranked as word windows
+_MAX_SENTENCE_WORDS = 30
+
+
+def _split_sentences(text: str) -> List[str]:
+    sentences: List[str] = []
+    for sent in _SENTENCE_RE.findall(text):
+        words = sent.split()
+        for i in range(0, len(words), _MAX_SENTENCE_WORDS):
+            sentences.append(" ".join(words[i:i + _MAX_SENTENCE_WORDS]))
+    return sentences
+
+
+def _trim(sentence: str, max_tokens: int) -> str:
+    if _estimate_tokens(sentence) <= max_tokens:
+        return sentence
+    cut = sentence[: max(1, max_tokens) * 4]
+    return cut.rsplit(" ", 1)[0] if " " in cut else cut
+
+
+def compress_chunks(
+    chunks: List[Chunk],
+    max_tokens: int,
+    damping: float = 0.85,
+    iterations: int = 30,
+) -> List[str]:
+    """Return one text per chunk keeping only its top-ranked sentences.
+
+    Sentences of every chunk are scored together with TextRank over TF-IDF
+    cosine similarity. Term columns are offset per chunk, so the similarity
+    matrix is block-diagonal and sentences only vote for neighbours inside
+    their own chunk. The best sentences of each chunk are kept, in original
+    order, until ``max_tokens`` is reached.
+    """
+    try:
+        import numpy as np
+        from scipy import sparse
+    except Exception as exc:
+        raise RuntimeError("numpy/scipy not installed. pip install numpy scipy") from exc
+
+    sentences: List[str] = []
+    owners: List[int] = []
+    for idx, ch in enumerate(chunks):
+        for sent in _split_sentences(ch.text):
+            sentences.append(sent)
+            owners.append(idx)
+    if not sentences:
+        return [ch.text for ch in chunks]
+
+    vocab: dict = {}
+    rows: List[int] = []
+    cols: List[int] = []
+    for row, sent in enumerate(sentences):
+        for word in _WORD_RE.findall(sent.lower()):
+            rows.append(row)
+            cols.append(vocab.setdefault(word, len(vocab)))
+
+    n_sents = len(sentences)
+    n_terms = max(1, len(vocab))
+    owner = np.asarray(owners, dtype=np.int64)
+    tokens = np.fromiter((_estimate_tokens(s) for s in sentences), dtype=np.int64, count=n_sents)
+
+    row_arr = np.asarray(rows, dtype=np.int64)
+    col_arr = np.asarray(cols, dtype=np.int64)
+    tf = sparse.coo_matrix(
+        (np.ones(len(row_arr)), (row_arr, col_arr)), shape=(n_sents, n_terms)
+    ).tocsr().tocoo()
+
+    # idf is computed per chunk: a term that appears in every sentence of a
+    # chunk carries no information for ranking within that chunk.
+    sent_counts = np.bincount(owner, minlength=len(chunks)).astype(np.float64)
+    block_cols = owner[tf.row] * n_terms + tf.col
+    df = np.bincount(block_cols, minlength=len(chunks) * n_terms).astype(np.float64)
+    idf = np.log((1.0 + sent_counts[owner[tf.row]]) / (1.0 + df[block_cols])) + 1.0
+
+    tfidf = sparse.csr_matrix(
+        (tf.data * idf, (tf.row, block_cols)), shape=(n_sents, len(chunks) * n_terms)
+    )
+    norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    tfidf = sparse.diags(1.0 / norms) @ tfidf
+
+    sim = (tfidf @ tfidf.T).tocsr()
+    sim.setdiag(0.0)
+    sim.eliminate_zeros()
+
+    out_degree = np.asarray(sim.sum(axis=1)).ravel()
+    out_degree[out_degree == 0] = 1.0
+    transition = (sparse.diags(1.0 / out_degree) @ sim).T.tocsr()
+
+    teleport = (1.0 - damping) / sent_counts[owner]
+    scores = 1.0 / sent_counts[owner]
+    for _ in range(iterations):
+        scores = teleport + damping * (transition @ scores)
+
+    # Rank within each chunk, then keep the best sentences until the budget is
+    # spent. The top sentence of a chunk is always kept (trimmed to the budget)
+    # so no chunk is empty.
+    order = np.lexsort((-scores, owner))
+    ranked_owner = owner[order]
+    ranked_tokens = tokens[order]
+    cumulative = np.cumsum(ranked_tokens)
+    group_start = np.r_[0, np.flatnonzero(np.diff(ranked_owner)) + 1]
+    group_offset = np.repeat(cumulative[group_start] - ranked_tokens[group_start], np.diff(np.r_[group_start, n_sents]))
+    within = cumulative - group_offset
+    first = np.zeros(n_sents, dtype=bool)
+    first[group_start] = True
+    keep = np.zeros(n_sents, dtype=bool)
+    keep[order] = (within <= max_tokens) | first
+
+    compressed: List[List[str]] = [[] for _ in chunks]
+    for row in np.flatnonzero(keep):
+        compressed[owners[row]].append(_trim(sentences[row], max_tokens))
+    return [" ".join(parts) if parts else ch.text for ch, parts in zip(chunks, compressed)]
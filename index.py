@@ -0,0 +1,214 @@
+import glob
+import json
+import math
+import os
+import re
+import sqlite3
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from downloader import parse_timestamp
+
+
+INDEX_FILENAME = "summaries.index.sqlite3"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_WINDOW_SUFFIX_RE = re.compile(r"\.\d+(?:\.\d+)?-(?:\d+(?:\.\d+)?|end)$")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with".split()
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    video_title TEXT NOT NULL,
+    chapter INTEGER NOT NULL,
+    start_seconds REAL NOT NULL,
+    end_seconds REAL NOT NULL,
+    title TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS docs_source ON docs(source);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    doc_id INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_doc ON postings(doc_id);
+CREATE TABLE IF NOT EXISTS stats (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO stats(key, value) VALUES ('doc_count', 0), ('total_length', 0);
+"""
+
+
+@dataclass
+class SearchHit:
+    video_id: str
+    video_title: str
+    chapter_title: str
+    start: float
+    end: float
+    summary: str
+    score: float
+
+    @property
+    def url(self) -> str:
+        return f"https://www.youtube.com/watch?v={self.video_id}&t={int(self.start)}s"
+
+
+def _tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def index_path(output_dir: str) -> str:
+    return os.path.join(output_dir, INDEX_FILENAME)
+
+
+class SummaryIndex:
+    """Inverted index over chapters of the summaries written by ``main.run``.
+
+    Each chapter is one document, so hits point at a timestamp. Postings and
+    corpus statistics live in SQLite and are updated per summary; re-adding a
+    source replaces its previous chapters.
+    """
+
+    def __init__(self, path: str, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "SummaryIndex":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def add(self, video_id: str, summary: Dict[str, Any], source: Optional[str] = None) -> None:
+        source = source or video_id
+        video_title = summary.get("video_title", "")
+        with self._conn:
+            self._remove(source)
+            added_docs = 0
+            added_length = 0
+            for i, ch in enumerate(summary.get("chapters", []), start=1):
+                text = " ".join([ch.get("title", ""), ch.get("summary", "")] + list(ch.get("key_points", [])))
+                counts = Counter(_tokenize(text))
+                length = sum(counts.values())
+                cur = self._conn.execute(
+                    "INSERT INTO docs(source, video_id, video_title, chapter, start_seconds, end_seconds, title, summary, length)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        source,
+                        video_id,
+                        video_title,
+                        i,
+                        # to_json writes "MM:SS" or "HH:MM:SS"
+                        parse_timestamp(str(ch.get("start", 0))),
+                        parse_timestamp(str(ch.get("end", 0))),
+                        ch.get("title", ""),
+                        ch.get("summary", ""),
+                        length,
+                    ),
+                )
+                self._conn.executemany(
+                    "INSERT INTO postings(term, doc_id, tf) VALUES (?, ?, ?)",
+                    [(term, cur.lastrowid, tf) for term, tf in counts.items()],
+                )
+                added_docs += 1
+                added_length += length
+            self._bump_stats(added_docs, added_length)
+
+    def sources(self) -> List[str]:
+        return [r[0] for r in self._conn.execute("SELECT DISTINCT source FROM docs")]
+
+    def remove(self, source: str) -> None:
+        with self._conn:
+            self._remove(source)
+
+    def _remove(self, source: str) -> None:
+        rows = self._conn.execute("SELECT id, length FROM docs WHERE source = ?", (source,)).fetchall()
+        if not rows:
+            return
+        self._conn.executemany("DELETE FROM postings WHERE doc_id = ?", [(r[0],) for r in rows])
+        self._conn.execute("DELETE FROM docs WHERE source = ?", (source,))
+        self._bump_stats(-len(rows), -sum(r[1] for r in rows))
+
+    def _bump_stats(self, docs: int, length: int) -> None:
+        self._conn.execute("UPDATE stats SET value = value + ? WHERE key = 'doc_count'", (docs,))
+        self._conn.execute("UPDATE stats SET value = value + ? WHERE key = 'total_length'", (length,))
+
+    def search(self, query: str, limit: int = 10) -> List[SearchHit]:
+        terms = sorted(set(_tokenize(query)))
+        if not terms:
+            return []
+        stats = dict(self._conn.execute("SELECT key, value FROM stats"))
+        n_docs = stats.get("doc_count", 0)
+        if n_docs <= 0:
+            return []
+        avgdl = max(1.0, stats.get("total_length", 0) / n_docs)
+
+        scores: Dict[int, float] = {}
+        for term in terms:
+            postings = self._conn.execute(
+                "SELECT p.doc_id, p.tf, d.length FROM postings p JOIN docs d ON d.id = p.doc_id WHERE p.term = ?",
+                (term,),
+            ).fetchall()
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+            for doc_id, tf, length in postings:
+                norm = tf + self.k1 * (1.0 - self.b + self.b * length / avgdl)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1.0) / norm
+
+        top = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:limit]
+        hits: List[SearchHit] = []
+        for doc_id, score in top:
+            row = self._conn.execute(
+                "SELECT video_id, video_title, title, start_seconds, end_seconds, summary FROM docs WHERE id = ?", (doc_id,)
+            ).fetchone()
+            hits.append(
+                SearchHit(
+                    video_id=row[0],
+                    video_title=row[1],
+                    chapter_title=row[2],
+                    start=row[3],
+                    end=row[4],
+                    summary=row[5],
+                    score=score,
+                )
+            )
+        return hits
+
+
+def rebuild(output_dir: str) -> int:
+    """Sync the index with the ``*.summary.json`` files in ``output_dir``.
+
+    Every file is (re)indexed and sources whose file is gone are dropped.
+    Returns the number of files indexed.
+    """
+    found = set()
+    with SummaryIndex(index_path(output_dir)) as idx:
+        for path in sorted(glob.glob(os.path.join(output_dir, "*.summary.json"))):
+            source = os.path.basename(path)[: -len(".summary.json")]
+            # windowed runs are saved as <video_id>.<start>-<end>
+            video_id = _WINDOW_SUFFIX_RE.sub("", source)
+            with open(path, "r", encoding="utf-8") as f:
+                idx.add(video_id, json.load(f), source=source)
+            found.add(source)
+        for source in idx.sources():
+            if source not in found:
+                idx.remove(source)
+    return len(found)
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Offline load test for the summarization pipeline.
+
+A fake ``yt-dlp`` executable serves canned metadata, audio and json3
+captions, and a local OpenAI-compatible server answers chat completions
+with configurable latency and error rates. N jobs are then driven through
+``main.run`` (in-process), a warm daemon, or the CLI, and latency
+percentiles, throughput and resource usage are reported.
+
+    python loadtest.py --jobs 50 --concurrency 8 --latency 0.2 --error-rate 0.05
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import resource
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Runs as a standalone script; fixtures are derived from the video id so every
+# job gets stable, distinct content without shipping binary files.
+_FAKE_YTDLP = r'''#!{python}
+import json
+import os
+import random
+import sys
+import time
+
+args = sys.argv[1:]
+if "--version" in args:
+    print("2099.01.01-loadtest")
+    sys.exit(0)
+
+url = args[-1]
+video_id = url.split("v=")[-1].split("&")[0] if "v=" in url else url.rstrip("/").split("/")[-1]
+seconds = int(os.environ.get("LOADTEST_VIDEO_SECONDS", "1800"))
+time.sleep(float(os.environ.get("LOADTEST_YTDLP_LATENCY", "0")))
+
+def opt(name, default=None):
+    return args[args.index(name) + 1] if name in args else default
+
+if "--print" in args:
+    print(video_id)
+    print(f"Load test video {{video_id}}")
+    print(seconds)
+    print("Synthetic video served by the load-test harness.")
+    sys.exit(0)
+
+out = opt("-o")
+if "--write-auto-sub" in args:
+    rng = random.Random(video_id)
+    words = ("model data training loss gradient network layer memory cache latency "
+             "request queue thread process socket index query token budget chapter "
+             "summary caption audio stream video window segment").split()
+    events = [{{"tStartMs": 0, "dDurationMs": seconds * 1000, "id": 1, "wpWinPosId": 1, "wsWinStyleId": 1}}]
+    t = 0
+    while t < seconds * 1000:
+        n = rng.randint(6, 12)
+        segs = [{{"utf8": rng.choice(words)}}] + [
+            {{"utf8": " " + rng.choice(words), "tOffsetMs": i * 350}} for i in range(1, n)
+        ]
+        segs[-1]["utf8"] += rng.choice(["", "", "."])
+        events.append({{"tStartMs": t, "dDurationMs": 6000, "wWinId": 1, "segs": segs}})
+        events.append({{"tStartMs": t + n * 350, "dDurationMs": 3000, "wWinId": 1, "aAppend": 1, "segs": [{{"utf8": "\n"}}]}})
+        t += n * 350 + 200
+    with open(f"{{out}}.{{opt('--sub-lang', 'en')}}.json3", "w", encoding="utf-8") as f:
+        json.dump({{"wireMagic": "pb3", "events": events}}, f)
+elif out:
+    with open(out, "wb") as f:
+        f.write(b"\x00" * 1024)
+'''
+
+
+class MockAPIServer:
+    """OpenAI-compatible chat completions endpoint with injected latency and errors."""
+
+    def __init__(self, latency: float = 0.1, jitter: float = 0.05, error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.stats = {"requests": 0, "errors": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def start(self) -> "MockAPIServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _draw(self) -> Tuple[float, Optional[int]]:
+        with self._lock:
+            self.stats["requests"] += 1
+            delay = max(0.0, self._rng.gauss(self.latency, self.jitter))
+            if self._rng.random() < self.error_rate:
+                self.stats["errors"] += 1
+                return delay, self._rng.choice([429, 500, 503])
+            return delay, None
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _reply(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                delay, error = mock._draw()
+                time.sleep(delay)
+                if error == 429:
+                    self._reply(429, {"error": {"message": "rate limited", "type": "rate_limit"}}, {"Retry-After": "1"})
+                    return
+                if error:
+                    self._reply(error, {"error": {"message": "injected failure", "type": "server_error"}})
+                    return
+                if not self.path.endswith("/chat/completions"):
+                    self._reply(404, {"error": {"message": f"unknown path {self.path}"}})
+                    return
+
+                prompt = " ".join(str(m.get("content", "")) for m in request.get("messages", []))
+                if (request.get("response_format") or {}).get("type") == "json_object":
+                    content = json.dumps(
+                        {
+                            "title": "Synthetic chapter title",
+                            "summary": "This section was summarized by the mock API.",
+                            "key_points": ["First point", "Second point", "Third point"],
+                        }
+                    )
+                else:
+                    content = "This synthetic video covers several topics. It was summarized by the mock API."
+                prompt_tokens = max(1, len(prompt) // 4)
+                completion_tokens = max(1, len(content) // 4)
+                self._reply(
+                    200,
+                    {
+                        "id": "chatcmpl-loadtest",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": request.get("model", "mock"),
+                        "choices": [
+                            {
+                                "index": 0,
+                                "message": {"role": "assistant", "content": content},
+                                "finish_reason": "stop",
+                            }
+                        ],
+                        "usage": {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": completion_tokens,
+                            "total_tokens": prompt_tokens + completion_tokens,
+                        },
+                    },
+                )
+
+        return Handler
+
+
+def install_fake_ytdlp(workdir: str) -> str:
+    bindir = os.path.join(workdir, "bin")
+    os.makedirs(bindir, exist_ok=True)
+    path = os.path.join(bindir, "yt-dlp")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(_FAKE_YTDLP.format(python=sys.executable))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return bindir
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _job_inprocess(url: str) -> None:
+    from main import run
+
+    run(url, None, None, None)
+
+
+def _job_daemon(url: str, socket_path: str) -> None:
+    from daemon import request
+
+    # queue behind the running job instead of falling back to in-process
+    response = request({"url": url, "json_out": None, "md_out": None, "language": None, "wait": True}, socket_path)
+    if response is None:
+        raise RuntimeError("daemon not reachable")
+    if not response.get("ok"):
+        raise RuntimeError(response.get("error"))
+
+
+def _job_cli(url: str) -> None:
+    subprocess.run(
+        [sys.executable, os.path.join(_ROOT, "main.py"), url, "--no-daemon"],
+        check=True,
+        capture_output=True,
+        cwd=_ROOT,
+    )
+
+
+def _wait_for_socket(path: str, proc: subprocess.Popen, timeout: float = 120.0) -> None:
+    from daemon import request
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("daemon exited during startup")
+        if request({"ping": True}, path) is not None:
+            return
+        time.sleep(0.1)
+    raise RuntimeError("daemon did not start in time")
+
+
+def run_load(
+    jobs: int,
+    concurrency: int,
+    mode: str,
+    latency: float,
+    jitter: float,
+    error_rate: float,
+    video_seconds: int,
+    ytdlp_latency: float,
+    requests_per_minute: int,
+    tokens_per_minute: int,
+    keep: bool = False,
+) -> Dict[str, Any]:
+    workdir = tempfile.mkdtemp(prefix="ys_loadtest_")
+    server = MockAPIServer(latency=latency, jitter=jitter, error_rate=error_rate).start()
+    daemon_proc: Optional[subprocess.Popen] = None
+    saved_env = dict(os.environ)
+    try:
+        os.environ.update(
+            {
+                "PATH": install_fake_ytdlp(workdir) + os.pathsep + os.environ.get("PATH", ""),
+                "OPENAI_BASE_URL": server.base_url,
+                "OPENAI_API_KEY": "loadtest",
+                "HUGGINGFACE_API_KEY": "loadtest",
+                "HUGGINGFACE_MODEL": "mock-model",
+                "SUMMARIZER_BACKEND": "openai",
+                "OUTPUT_DIR": os.path.join(workdir, "outputs"),
+                "DAEMON_SOCKET": os.path.join(workdir, "daemon.sock"),
+                "API_REQUESTS_PER_MINUTE": str(requests_per_minute),
+                "API_TOKENS_PER_MINUTE": str(tokens_per_minute),
+                "LOADTEST_VIDEO_SECONDS": str(video_seconds),
+                "LOADTEST_YTDLP_LATENCY": str(ytdlp_latency),
+            }
+        )
+        if _ROOT not in sys.path:
+            sys.path.insert(0, _ROOT)
+
+        if mode == "daemon":
+            daemon_proc = subprocess.Popen(
+                [sys.executable, os.path.join(_ROOT, "main.py"), "serve"],
+                cwd=_ROOT,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            _wait_for_socket(os.environ["DAEMON_SOCKET"], daemon_proc)
+
+        def job(i: int) -> Tuple[float, Optional[str]]:
+            url = f"https://www.youtube.com/watch?v=load{i:05d}"
+            t0 = time.perf_counter()
+            try:
+                if mode == "daemon":
+                    _job_daemon(url, os.environ["DAEMON_SOCKET"])
+                elif mode == "cli":
+                    _job_cli(url)
+                else:
+                    _job_inprocess(url)
+                error = None
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"
+            return time.perf_counter() - t0, error
+
+        usage_before = (resource.getrusage(resource.RUSAGE_SELF), resource.getrusage(resource.RUSAGE_CHILDREN))
+        started = time.perf_counter()
+        # main.run prints progress; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                results = list(pool.map(job, range(jobs)))
+        wall = time.perf_counter() - started
+        if daemon_proc is not None:
+            # reap the daemon so its CPU time shows up in RUSAGE_CHILDREN
+            daemon_proc.terminate()
+            daemon_proc.wait(timeout=10)
+            daemon_proc = None
+        usage_after = (resource.getrusage(resource.RUSAGE_SELF), resource.getrusage(resource.RUSAGE_CHILDREN))
+
+        latencies = [lat for lat, err in results if err is None]
+        errors = [err for _, err in results if err is not None]
+        cpu = sum(
+            (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+            for before, after in zip(usage_before, usage_after)
+        )
+        # ru_maxrss is KiB on Linux and bytes on macOS
+        rss_scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return {
+            "mode": mode,
+            "jobs": jobs,
+            "concurrency": concurrency,
+            "succeeded": len(latencies),
+            "failed": len(errors),
+            "wall_seconds": wall,
+            "throughput_jobs_per_second": len(latencies) / wall if wall > 0 else 0.0,
+            "latency_seconds": {
+                "p50": percentile(latencies, 50),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99),
+                "max": max(latencies) if latencies else 0.0,
+            },
+            "cpu_seconds": cpu,
+            "max_rss_mb": {
+                "harness": usage_after[0].ru_maxrss / rss_scale,
+                "children": usage_after[1].ru_maxrss / rss_scale,
+            },
+            "api": dict(server.stats),
+            "sample_errors": errors[:5],
+            "workdir": workdir if keep else None,
+        }
+    finally:
+        if daemon_proc is not None:
+            daemon_proc.terminate()
+            daemon_proc.wait(timeout=10)
+        os.environ.clear()
+        os.environ.update(saved_env)
+        server.stop()
+        if not keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    lat = report["latency_seconds"]
+    print(f"Mode: {report['mode']}  jobs: {report['jobs']}  concurrency: {report['concurrency']}")
+    print(f"Succeeded: {report['succeeded']}  failed: {report['failed']}")
+    print(f"Wall time: {report['wall_seconds']:.2f}s  throughput: {report['throughput_jobs_per_second']:.2f} jobs/s")
+    print(f"Latency p50 {lat['p50']:.3f}s  p95 {lat['p95']:.3f}s  p99 {lat['p99']:.3f}s  max {lat['max']:.3f}s")
+    print(
+        f"CPU: {report['cpu_seconds']:.2f}s  max RSS: {report['max_rss_mb']['harness']:.1f} MB harness, "
+        f"{report['max_rss_mb']['children']:.1f} MB children"
+    )
+    print(f"API requests: {report['api']['requests']}  injected errors: {report['api']['errors']}")
+    for err in report["sample_errors"]:
+        print(f"  error: {err}")
+    if report["workdir"]:
+        print(f"Artifacts kept in {report['workdir']}")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Offline load test for the YouTube summarizer pipeline")
+    p.add_argument("--jobs", type=int, default=20, help="Number of videos to summarize")
+    p.add_argument("--concurrency", type=int, default=4, help="Jobs in flight at once")
+    p.add_argument("--mode", choices=["inprocess", "daemon", "cli"], default="inprocess", help="How jobs are driven")
+    p.add_argument("--latency", type=float, default=0.1, help="Mean mock API latency in seconds")
+    p.add_argument("--jitter", type=float, default=0.05, help="Std deviation of mock API latency")
+    p.add_argument("--error-rate", type=float, default=0.0, help="Fraction of API calls answered with 429/5xx")
+    p.add_argument("--video-seconds", type=int, default=1800, help="Length of the synthetic videos")
+    p.add_argument("--ytdlp-latency", type=float, default=0.0, help="Delay added to every fake yt-dlp call")
+    p.add_argument("--rpm", type=int, default=6000, help="API_REQUESTS_PER_MINUTE for the run")
+    p.add_argument("--tpm", type=int, default=10_000_000, help="API_TOKENS_PER_MINUTE for the run")
+    p.add_argument("--json", dest="json_out", default=None, help="Also write the report as JSON")
+    p.add_argument("--keep", action="store_true", help="Keep the working directory with outputs")
+    args = p.parse_args()
+
+    report = run_load(
+        jobs=args.jobs,
+        concurrency=args.concurrency,
+        mode=args.mode,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        video_seconds=args.video_seconds,
+        ytdlp_latency=args.ytdlp_latency,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        keep=args.keep,
+    )
+    _print_report(report)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,51 +1,94 @@
 import argparse
 import json
 import os
-from typing import Optional
-
-from config import load_settings
-from downloader import fetch_with_ytdlp
-from transcriber import transcribe
-from chunker import chunk_segments
-from summarizer import summarize_chunks, synthesize_overview, to_json, to_markdown
-
-
-def run(url: str, out_json: Optional[str], out_md: Optional[str], language: Optional[str]) -> None:
-    settings = load_settings()
+import sys
+from dataclasses import replace
+from typing import List, Optional
+
+from api_client import configure as configure_api
+from checkpoint import CheckpointJournal
+from config import Settings, load_settings
+from daemon import request as daemon_request, serve
+from index import SummaryIndex, index_path, rebuild
+from downloader import VideoMetadata, fetch_with_ytdlp, parse_timestamp, window_suffix
+from transcriber import TranscriptSegment, transcribe
+from chunker import Chunk, chunk_segments
+from summarizer import Chapter, summarize_chunks, synthesize_overview, to_json, to_markdown
+
+
+def run(
+    url: str,
+    out_json: Optional[str],
+    out_md: Optional[str],
+    language: Optional[str],
+    settings: Optional[Settings] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+) -> None:
+    settings = settings or load_settings()
     os.makedirs(settings.output_dir, exist_ok=True)
-
-    meta = fetch_with_ytdlp(url, preferred_lang=language or "en")
-
-    segments = transcribe(
-        audio_path=meta.audio_path,
-        transcript_events=meta.transcript_events,
-        backend=settings.transcription_backend,
-        model=settings.transcription_model,
-        language=language,
-    )
-
-    chunks = chunk_segments(
-        segments,
-        max_tokens=settings.max_chunk_tokens,
-        gap_seconds=settings.chunk_gap_seconds,
-        max_duration_seconds=settings.chunk_max_seconds,
-    )
+    configure_api(settings)
+
+    # Completed stages are journaled so a crashed run resumes where it stopped
+    fingerprint = {
+        "language": language,
+        "transcription": [settings.transcription_backend, settings.transcription_model],
+        "chunking": [settings.max_chunk_tokens, settings.chunk_gap_seconds, settings.chunk_max_seconds],
+        "summarizer": [settings.summarizer_backend, settings.huggingface_model, settings.summary_input_tokens],
+    }
+    journal = CheckpointJournal.for_run(settings.output_dir, url, start, end, fingerprint=fingerprint)
+
+    meta = journal.load("metadata", VideoMetadata)
+    segments = journal.load_list("segments", TranscriptSegment)
+    if segments is None:
+        if meta is None or (not meta.transcript_events and not os.path.exists(meta.audio_path)):
+            meta = fetch_with_ytdlp(url, preferred_lang=language or "en", start=start, end=end)
+            journal.record("metadata", meta)
+        segments = transcribe(
+            audio_path=meta.audio_path,
+            transcript_events=meta.transcript_events,
+            backend=settings.transcription_backend,
+            model=settings.transcription_model,
+            language=language,
+            time_offset=meta.audio_offset_seconds,
+            window_end=meta.window_end_seconds,
+        )
+        journal.record("segments", segments)
+        # caption events are only needed to rebuild the segments
+        if meta.transcript_events:
+            journal.record("metadata", replace(meta, transcript_events=[]))
+            journal.compact()
+
+    chunks = journal.load_list("chunks", Chunk)
+    if chunks is None:
+        chunks = chunk_segments(
+            segments,
+            max_tokens=settings.max_chunk_tokens,
+            gap_seconds=settings.chunk_gap_seconds,
+            max_duration_seconds=settings.chunk_max_seconds,
+        )
+        journal.record("chunks", chunks)
 
     chapters = summarize_chunks(
         chunks=chunks,
         video_title=meta.title,
         model=settings.huggingface_model,
         huggingface_api_key=settings.huggingface_api_key,
+        max_input_tokens=settings.summary_input_tokens,
+        use_huggingface=settings.summarizer_backend != "openai",
+        completed=journal.chapters(Chapter),
+        on_chapter=journal.record_chapter,
     )
 
     overview = synthesize_overview(chapters, settings.huggingface_model, settings.huggingface_api_key)
     result_json = to_json(meta.title, chapters)
     result_md = to_markdown(meta.title, overview, chapters)
 
+    name = meta.video_id + window_suffix(start, end)
     if out_json is None:
-        out_json = os.path.join(settings.output_dir, f"{meta.video_id}.summary.json")
+        out_json = os.path.join(settings.output_dir, f"{name}.summary.json")
     if out_md is None:
-        out_md = os.path.join(settings.output_dir, f"{meta.video_id}.summary.md")
+        out_md = os.path.join(settings.output_dir, f"{name}.summary.md")
 
     with open(out_json, "w", encoding="utf-8") as f:
         json.dump(result_json, f, ensure_ascii=False, indent=2)
@@ -55,16 +98,107 @@ def run(url: str, out_json: Optional[str], out_md: Optional[str], language: Opti
     print(f"Saved JSON to {out_json}")
     print(f"Saved Markdown to {out_md}")
 
+    # the summary files are already saved; a failing index update must not lose them
+    try:
+        with SummaryIndex(index_path(settings.output_dir)) as idx:
+            idx.add(meta.video_id, result_json, source=name)
+    except Exception as exc:
+        print(f"Warning: search index not updated: {exc}")
+
+    failed = [idx for idx in range(1, len(chunks) + 1) if not journal.has_chapter(idx)]
+    if failed:
+        # keep the journal so a rerun only retries the failed chapters
+        print(f"Warning: chapters {', '.join(map(str, failed))} fell back to placeholder summaries; rerun to retry them")
+    else:
+        journal.clear()
+
 
-def cli():
-    p = argparse.ArgumentParser(description="YouTube Summarization Agent")
+def search(query: str, limit: int = 10) -> None:
+    settings = load_settings()
+    path = index_path(settings.output_dir)
+    if not os.path.exists(path):
+        print("No search index yet. Summarize a video or run 'main.py search --reindex'.")
+        return
+    with SummaryIndex(path) as idx:
+        hits = idx.search(query, limit=limit)
+    if not hits:
+        print("No matches.")
+    for hit in hits:
+        print(f"{hit.score:6.2f}  {hit.video_title} - {hit.chapter_title}")
+        print(f"        {hit.url}")
+
+
+def _forward(
+    url: str,
+    out_json: Optional[str],
+    out_md: Optional[str],
+    language: Optional[str],
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+) -> bool:
+    """Hand the job to a running daemon. Returns False if none is listening."""
+    payload = {
+        "url": url,
+        # the daemon has its own working directory
+        "json_out": os.path.abspath(out_json) if out_json else None,
+        "md_out": os.path.abspath(out_md) if out_md else None,
+        "language": language,
+        "start": start,
+        "end": end,
+    }
+    response = daemon_request(payload, load_settings().daemon_socket)
+    if response is None:
+        return False
+    if not response.get("ok"):
+        raise RuntimeError(f"Daemon failed: {response.get('error')}")
+    print(response.get("output", ""), end="")
+    return True
+
+
+def cli(argv: Optional[List[str]] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "serve":
+        sp = argparse.ArgumentParser(prog="main.py serve", description="Run a warm summarization daemon")
+        sp.add_argument("--socket", dest="socket_path", default=None, help="Unix socket path")
+        sargs = sp.parse_args(argv[1:])
+        serve(sargs.socket_path)
+        return
+    if argv and argv[0] == "search":
+        qp = argparse.ArgumentParser(prog="main.py search", description="Search generated summaries")
+        qp.add_argument("query", nargs="?", default=None, help="Search terms")
+        qp.add_argument("--limit", type=int, default=10, help="Maximum number of hits")
+        qp.add_argument("--reindex", action="store_true", help="Index existing summaries in the output directory first")
+        qargs = qp.parse_args(argv[1:])
+        if qargs.reindex:
+            settings = load_settings()
+            os.makedirs(settings.output_dir, exist_ok=True)
+            print(f"Indexed {rebuild(settings.output_dir)} summaries")
+        if qargs.query:
+            search(qargs.query, qargs.limit)
+        elif not qargs.reindex:
+            qp.error("a query is required")
+        return
+
+    p = argparse.ArgumentParser(
+        description="YouTube Summarization Agent",
+        epilog=(
+            "Run 'main.py serve' to start a daemon that keeps models loaded between runs, "
+            "or 'main.py search QUERY' to search generated summaries."
+        ),
+    )
     p.add_argument("url", help="YouTube video URL")
     p.add_argument("--json", dest="json_out", default=None, help="Output JSON path")
     p.add_argument("--md", dest="md_out", default=None, help="Output Markdown path")
     p.add_argument("--lang", dest="language", default=None, help="Language code (e.g., en, es)")
-    args = p.parse_args()
-    run(args.url, args.json_out, args.md_out, args.language)
-
+    p.add_argument("--start", type=parse_timestamp, default=None, help="Summarize from this time (SS, MM:SS or HH:MM:SS)")
+    p.add_argument("--end", type=parse_timestamp, default=None, help="Summarize up to this time (SS, MM:SS or HH:MM:SS)")
+    p.add_argument("--no-daemon", dest="no_daemon", action="store_true", help="Always run in this process")
+    args = p.parse_args(argv)
+    if args.start is not None and args.end is not None and args.end <= args.start:
+        p.error("--end must be after --start")
+    if not args.no_daemon and _forward(args.url, args.json_out, args.md_out, args.language, args.start, args.end):
+        return
+    run(args.url, args.json_out, args.md_out, args.language, start=args.start, end=args.end)
 
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,32 @@
+import threading
+from typing import Any, Dict, Tuple
+
+
+# Loaded models are kept for the lifetime of the process so that a long-lived
+# daemon only pays the load cost once.
+_CACHE: Dict[Tuple[str, str], Any] = {}
+_LOCK = threading.Lock()
+
+
+def get_pipeline(task: str, model: str) -> Any:
+    key = (task, model)
+    with _LOCK:
+        if key not in _CACHE:
+            try:
+                from transformers import pipeline
+            except Exception as exc:
+                raise RuntimeError("transformers package not installed. pip install transformers") from exc
+            _CACHE[key] = pipeline(task, model=model)
+        return _CACHE[key]
+
+
+def get_whisper(model: str) -> Any:
+    key = ("whisper_local", model)
+    with _LOCK:
+        if key not in _CACHE:
+            try:
+                import whisper  # type: ignore
+            except Exception as exc:
+                raise RuntimeError("Local whisper not installed. pip install openai-whisper") from exc
+            _CACHE[key] = whisper.load_model(model)
+        return _CACHE[key]
@@ -70,6 +70,7 @@ def test_imports():
         import downloader
         import transcriber
         import chunker
+        import extractive
         import summarizer
         print("OK: All modules imported successfully")
         return True
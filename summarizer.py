@@ -1,9 +1,11 @@
 import json
-import time
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
-from chunker import Chunk
+from api_client import get_client, governed_call
+from chunker import Chunk, _estimate_tokens
+from extractive import compress_chunks
+from models import get_pipeline
 
 
 @dataclass
@@ -15,41 +17,35 @@ class Chapter:
     key_points: List[str]
 
 
-def _retry(fn, retries: int = 3, backoff: float = 1.5):
-    err: Optional[Exception] = None
-    for i in range(retries):
-        try:
-            return fn()
-        except Exception as e:
-            err = e
-            time.sleep(backoff * (2 ** i))
-    if err:
-        raise err
-    raise RuntimeError("Retry failed without exception")
-
-
 def summarize_chunks(
     chunks: List[Chunk],
     video_title: str,
     model: str,
     huggingface_api_key: Optional[str],
     use_huggingface: bool = True,  # default to HF instead of OpenAI
+    max_input_tokens: int = 384,
+    completed: Optional[Dict[int, Chapter]] = None,
+    on_chapter: Optional[Callable[[int, Chapter], None]] = None,
 ) -> List[Chapter]:
+    # completed: chapters (by 1-based index) already produced by an earlier
+    # attempt; on_chapter is called for every newly summarized chapter.
+    completed = completed or {}
     chapters: List[Chapter] = []
+    if all(idx in completed for idx in range(1, len(chunks) + 1)):
+        return [completed[idx] for idx in range(1, len(chunks) + 1)]
 
     if use_huggingface:
-        try:
-            from transformers import pipeline
-        except Exception as exc:
-            raise RuntimeError("transformers package not installed. pip install transformers") from exc
-
-        summarizer = pipeline("summarization", model=model)
-        for idx, ch in enumerate(chunks, start=1):
-            # Truncate text if it's too long for the model
-            text = ch.text
-            if len(text) > 1500:  # Increased limit for more context
-                text = text[:1500] + "..."
-            
+        summarizer = get_pipeline("summarization", model)
+        # Keep the highest-ranked sentences of each chunk within the input
+        # budget instead of cutting the text at a fixed length
+        model_max = getattr(summarizer.tokenizer, "model_max_length", 1024) or 1024
+        input_budget = min(max_input_tokens, int(model_max) * 3 // 4)
+        texts = compress_chunks(chunks, max_tokens=input_budget)
+        for idx, (ch, text) in enumerate(zip(chunks, texts), start=1):
+            if idx in completed:
+                chapters.append(completed[idx])
+                continue
+            summarized = True
             try:
                 # Adjust max_length based on input length for better summaries
                 input_length = len(text.split())
@@ -60,31 +56,31 @@ def summarize_chunks(
                     max_len = min(150, input_length // 2)
                     min_len = min(30, input_length // 4)
                 
-                summary = summarizer(text, max_length=max_len, min_length=min_len, do_sample=False)[0]["summary_text"]
+                summary = summarizer(text, max_length=max_len, min_length=min_len, do_sample=False, truncation=True)[0]["summary_text"]
             except Exception as e:
                 # Fallback to simple truncation if summarization fails
                 summary = text[:200] + "..." if len(text) > 200 else text
+                summarized = False
                 
-            chapters.append(
-                Chapter(
-                    title=f"Chapter {idx}",
-                    start=ch.start,
-                    end=ch.end,
-                    summary=summary,
-                    key_points=[],  # HF minimal version
-                )
+            chapter = Chapter(
+                title=f"Chapter {idx}",
+                start=ch.start,
+                end=ch.end,
+                summary=summary,
+                key_points=[],  # HF minimal version
             )
+            chapters.append(chapter)
+            if summarized and on_chapter:
+                on_chapter(idx, chapter)
         return chapters
 
     # ---------------- OpenAI GPT summarization ----------------
-    try:
-        from openai import OpenAI
-    except Exception as exc:
-        raise RuntimeError("openai package not installed. pip install openai") from exc
-
-    client = OpenAI(api_key=huggingface_api_key) if huggingface_api_key else OpenAI()
+    client = get_client(huggingface_api_key)
 
     for idx, ch in enumerate(chunks, start=1):
+        if idx in completed:
+            chapters.append(completed[idx])
+            continue
         user_prompt = (
             f"Analyze this section from the video '{video_title}'.\n"
             "Return strict JSON with keys: title (5-8 words), summary (2-3 sentences), key_points (3-5 bullets as strings).\n\n"
@@ -104,32 +100,31 @@ def summarize_chunks(
             return resp
 
         try:
-            resp = _retry(call)
+            # prompt plus room for the JSON answer
+            resp = governed_call(call, estimated_tokens=_estimate_tokens(user_prompt) + 300)
             content = resp.choices[0].message.content
             data = json.loads(content)
-            chapters.append(
-                Chapter(
-                    title=data.get("title", f"Chapter {idx}"),
-                    start=ch.start,
-                    end=ch.end,
-                    summary=data.get("summary", ""),
-                    key_points=list(data.get("key_points", [])),
-                )
+            chapter = Chapter(
+                title=data.get("title", f"Chapter {idx}"),
+                start=ch.start,
+                end=ch.end,
+                summary=data.get("summary", ""),
+                key_points=list(data.get("key_points", [])),
             )
         except Exception:
             chapters.append(
                 Chapter(title=f"Chapter {idx}", start=ch.start, end=ch.end, summary="Summary unavailable", key_points=[])
             )
+            continue
+        chapters.append(chapter)
+        if on_chapter:
+            on_chapter(idx, chapter)
 
     return chapters
 
 
 def synthesize_overview(chapters: List[Chapter], model: str, huggingface_api_key: Optional[str]) -> str:
-    try:
-        from openai import OpenAI  # type: ignore
-    except Exception as exc:
-        raise RuntimeError("openai package not installed. pip install openai") from exc
-    client = OpenAI(api_key=huggingface_api_key) if huggingface_api_key else OpenAI()
+    client = get_client(huggingface_api_key)
 
     summaries = " ".join(c.summary for c in chapters if c.summary)
     if not summaries:
@@ -147,7 +142,7 @@ def synthesize_overview(chapters: List[Chapter], model: str, huggingface_api_key
         )
 
     try:
-        resp = _retry(call)
+        resp = governed_call(call, estimated_tokens=_estimate_tokens(summaries) + 200)
         return resp.choices[0].message.content.strip()
     except Exception:
         return "This video covers multiple topics and key insights."
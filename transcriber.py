@@ -1,7 +1,11 @@
 import json
 import os
+import re
 from dataclasses import dataclass
-from typing import Dict, List, Literal, Optional
+from typing import Dict, List, Literal, Optional, Tuple
+
+from api_client import get_client, governed_call
+from models import get_pipeline, get_whisper
 
 
 @dataclass
@@ -11,17 +15,121 @@ class TranscriptSegment:
     text: str
 
 
-def _segments_from_json3(events: List[Dict]) -> List[TranscriptSegment]:
-    segments: List[TranscriptSegment] = []
-    for ev in events:
-        if "segs" not in ev:
+# Caption normalization limits
+_OVERLAP_WORDS = 8  # longest repeated run checked between adjacent rolling windows
+_WORD_MAX_MS = 1500  # display windows outlast speech; cap how long one word lasts
+_SENTENCE_GAP_MS = 1500  # silence that ends a sentence
+_SENTENCE_MAX_MS = 15000  # auto captions rarely carry punctuation; cap sentence length
+_SENTENCE_END = (".", "?", "!", "。", "？", "！")
+# a token keeps the whitespace written before it, so joining tokens restores the text
+_TOKEN_RE = re.compile(r"\s*\S+")
+_SPACE_RE = re.compile(r"\s+")
+# scripts written without spaces between words: CJK, kana, full-width forms, Thai
+_UNSPACED_RANGES = ((0x0E00, 0x0E7F), (0x2E80, 0x9FFF), (0xF900, 0xFAFF), (0xFF00, 0xFFEF), (0x20000, 0x2FFFF))
+
+
+def _norm(word: str) -> str:
+    return "".join(c for c in word.lower() if c.isalnum())
+
+
+def _unspaced(char: str) -> bool:
+    return any(lo <= ord(char) <= hi for lo, hi in _UNSPACED_RANGES)
+
+
+def _caption_words(events: List[Dict], end_ms: float = float("inf")) -> List[Tuple[float, float, str]]:
+    """Flatten json3 events into (start_ms, end_ms, token) without rolling repeats.
+
+    Append events and newline-only events are skipped. Word times come from
+    ``tOffsetMs``; events without offsets (manual captions) spread their words
+    evenly over the event duration. Tokens keep the whitespace written before
+    them; the first token of an event gets a space unless either side is in
+    a script written without spaces. When a window overlaps the previous one
+    and re-shows words from the tail of what was already emitted (same text,
+    timed at or before the last emitted word), those words are dropped.
+    Each event compares at most ``_OVERLAP_WORDS`` words, so this is linear.
+    No word ends after ``end_ms``, the end of a clipped window.
+    """
+    words: List[List] = []  # [start_ms, end_cap_ms, word]
+    tail: List[str] = []  # normalized last words emitted, at most _OVERLAP_WORDS
+    prev_end = float("-inf")
+
+    for ev in sorted(events, key=lambda e: float(e.get("tStartMs", 0))):
+        segs = ev.get("segs")
+        if not segs or ev.get("aAppend"):
+            continue
+        ev_start = float(ev.get("tStartMs", 0))
+        ev_end = ev_start + max(0.0, float(ev.get("dDurationMs", 0)))
+        has_offsets = any("tOffsetMs" in seg for seg in segs)
+
+        timed: List[Tuple[float, str]] = []
+        for i, seg in enumerate(segs):
+            tokens = [_SPACE_RE.sub(" ", tok) for tok in _TOKEN_RE.findall(seg.get("utf8", ""))]
+            if not tokens:
+                continue
+            seg_start = ev_start + float(seg.get("tOffsetMs", 0))
+            if has_offsets:
+                nxt = ev_start + float(segs[i + 1].get("tOffsetMs", 0)) if i + 1 < len(segs) else ev_end
+                seg_end = max(seg_start, nxt)
+            else:
+                seg_start, seg_end = ev_start, ev_end
+            step = (seg_end - seg_start) / len(tokens)
+            timed.extend((seg_start + k * step, tok) for k, tok in enumerate(tokens))
+        if not timed:
             continue
-        start = float(ev.get("tStartMs", 0)) / 1000.0
-        dur = float(ev.get("dDurationMs", ev.get("dDurationMs", 0))) / 1000.0
-        end = start + (dur if dur > 0 else 0)
-        text = "".join(seg.get("utf8", "") for seg in ev.get("segs", []))
-        if text.strip():
-            segments.append(TranscriptSegment(start=start, end=end, text=text.strip()))
+
+        skip = 0
+        if ev_start < prev_end and tail:
+            # Words are only re-shown text if they are timed no later than the
+            # last word already emitted; matching text alone would also drop
+            # phrases the speaker genuinely repeats.
+            last_start = words[-1][0]
+            normalized = [_norm(w) for _, w in timed[:_OVERLAP_WORDS]]
+            for k in range(min(len(tail), len(normalized)), 0, -1):
+                if timed[k - 1][0] <= last_start and tail[-k:] == normalized[:k]:
+                    skip = k
+                    break
+        prev_end = max(prev_end, ev_end)
+        if skip == len(timed):
+            continue
+
+        # events carry no whitespace between them; restore it where the script uses it
+        first_t, first = timed[skip]
+        if words and not first[0].isspace() and not (_unspaced(words[-1][2][-1]) or _unspaced(first[0])):
+            timed[skip] = (first_t, " " + first)
+
+        for t, word in timed[skip:]:
+            if words and t < words[-1][0]:
+                t = words[-1][0]  # keep time monotonic across overlapping windows
+            words.append([t, min(ev_end, t + _WORD_MAX_MS, end_ms), word])
+            tail.append(_norm(word))
+        del tail[:-_OVERLAP_WORDS]
+
+    # a word lasts until the next one starts, within its cap
+    for cur, nxt in zip(words, words[1:]):
+        cur[1] = max(cur[0], min(cur[1], nxt[0]))
+    return [(w[0], w[1], w[2]) for w in words]
+
+
+def _segments_from_json3(events: List[Dict], window_end: Optional[float] = None) -> List[TranscriptSegment]:
+    segments: List[TranscriptSegment] = []
+    current: List[Tuple[float, float, str]] = []
+
+    def flush():
+        if current:
+            text = "".join(w for _, _, w in current).strip()
+            segments.append(TranscriptSegment(start=current[0][0] / 1000.0, end=current[-1][1] / 1000.0, text=text))
+            current.clear()
+
+    end_ms = window_end * 1000.0 if window_end is not None else float("inf")
+    for word in _caption_words(events, end_ms):
+        if current and (
+            word[0] - current[-1][1] > _SENTENCE_GAP_MS or word[1] - current[0][0] > _SENTENCE_MAX_MS
+        ):
+            flush()
+        current.append(word)
+        if word[2].endswith(_SENTENCE_END):
+            flush()
+    flush()
     return segments
 
 
@@ -31,30 +139,46 @@ def transcribe(
     backend: Literal["auto", "openai", "whisper_local", "huggingface"] = "huggingface",
     model: str = "openai/whisper-large",
     language: Optional[str] = None,
+    time_offset: float = 0.0,
+    window_end: Optional[float] = None,
 ) -> List[TranscriptSegment]:
-    # Prefer provided json3 events when available
+    # Prefer provided json3 events when available (their timestamps are absolute)
     if transcript_events:
-        return _segments_from_json3(transcript_events)
+        return _segments_from_json3(transcript_events, window_end)
+
+    segments = _transcribe_audio(audio_path, backend, model, language)
+    if time_offset:
+        # audio of a partial download starts at time_offset within the video
+        for seg in segments:
+            seg.start += time_offset
+            seg.end += time_offset
+    return segments
 
+
+def _transcribe_audio(
+    audio_path: str,
+    backend: str,
+    model: str,
+    language: Optional[str],
+) -> List[TranscriptSegment]:
     selected = backend
     if backend == "auto":
         selected = "huggingface" if os.getenv("HUGGINGFACE_API_KEY") else "whisper_local"
 
     if selected == "openai":
-        try:
-            from openai import OpenAI  # type: ignore
-        except Exception as exc:
-            raise RuntimeError("openai package not installed. pip install openai") from exc
-
-        client = OpenAI()
-        with open(audio_path, "rb") as f:
-            resp = client.audio.transcriptions.create(
-                model=model,
-                file=f,
-                language=language,
-                response_format="verbose_json",
-                timestamp_granularities=["segment"],
-            )
+        client = get_client()
+
+        def call():
+            with open(audio_path, "rb") as f:
+                return client.audio.transcriptions.create(
+                    model=model,
+                    file=f,
+                    language=language,
+                    response_format="verbose_json",
+                    timestamp_granularities=["segment"],
+                )
+
+        resp = governed_call(call)
         segments: List[TranscriptSegment] = []
         for seg in resp.segments or []:
             segments.append(
@@ -64,12 +188,7 @@ def transcribe(
 
     # ---------------- Hugging Face transcription ----------------
     if selected == "huggingface":
-        try:
-            from transformers import pipeline
-        except Exception as exc:
-            raise RuntimeError("transformers package not installed. pip install transformers") from exc
-
-        hf_transcriber = pipeline("automatic-speech-recognition", model="openai/whisper-large")
+        hf_transcriber = get_pipeline("automatic-speech-recognition", "openai/whisper-large")
         result = hf_transcriber(audio_path)
         segments: List[TranscriptSegment] = [
             TranscriptSegment(start=0.0, end=0.0, text=result["text"].strip())
@@ -77,12 +196,7 @@ def transcribe(
         return segments
 
     # whisper local
-    try:
-        import whisper  # type: ignore
-    except Exception as exc:
-        raise RuntimeError("Local whisper not installed. pip install openai-whisper") from exc
-
-    wmodel = whisper.load_model("medium" if model == "whisper-1" else model)
+    wmodel = get_whisper("medium" if model == "whisper-1" else model)
     result = wmodel.transcribe(audio_path, language=language, verbose=False)
     segments: List[TranscriptSegment] = []
     for seg in result.get("segments", []):
@@ -13,14 +13,14 @@ if _ROOT not in sys.path:
 # Support running via package or direct script
 try:
     from config import load_settings
-    from downloader import fetch_with_ytdlp
+    from downloader import fetch_with_ytdlp, parse_timestamp, window_suffix
     from transcriber import transcribe
     from chunker import chunk_segments
     from summarizer import summarize_chunks, synthesize_overview, to_json, to_markdown
 except Exception:
     # Absolute imports after adding root to sys.path
     from youtube_summarizer.config import load_settings
-    from youtube_summarizer.downloader import fetch_with_ytdlp
+    from youtube_summarizer.downloader import fetch_with_ytdlp, parse_timestamp, window_suffix
     from youtube_summarizer.transcriber import transcribe
     from youtube_summarizer.chunker import chunk_segments
     from youtube_summarizer.summarizer import (
@@ -41,9 +41,22 @@ def app():
     # API key is loaded from env or Streamlit secrets; never hardcoded or shown
     url = st.text_input("YouTube URL", placeholder="https://www.youtube.com/watch?v=...")
     lang = st.text_input("Language code (optional)", value="en")
+    col_start, col_end = st.columns(2)
+    start_text = col_start.text_input("Start (optional)", placeholder="HH:MM:SS")
+    end_text = col_end.text_input("End (optional)", placeholder="HH:MM:SS")
     go = st.button("Summarize")
 
     if go and url:
+        try:
+            start = parse_timestamp(start_text) if start_text.strip() else None
+            end = parse_timestamp(end_text) if end_text.strip() else None
+        except ValueError as exc:
+            st.error(str(exc))
+            return
+        if start is not None and end is not None and end <= start:
+            st.error("End must be after start.")
+            return
+
         # Load API key from environment variables
         api_key = os.getenv("HUGGINGFACE_API_KEY")
         if not api_key:
@@ -58,7 +71,7 @@ def app():
         settings.huggingface_api_key = api_key
 
         with st.status("Fetching metadata and audio via yt-dlp...", expanded=False):
-            meta = fetch_with_ytdlp(url, preferred_lang=lang or "en")
+            meta = fetch_with_ytdlp(url, preferred_lang=lang or "en", start=start, end=end)
         st.success(f"Fetched: {meta.title}")
 
         with st.status("Transcribing...", expanded=False):
@@ -68,6 +81,8 @@ def app():
                 backend=settings.transcription_backend,
                 model=settings.transcription_model,
                 language=lang or None,
+                time_offset=meta.audio_offset_seconds,
+                window_end=meta.window_end_seconds,
             )
         st.success(f"Transcript segments: {len(segments)}")
 
@@ -80,12 +95,14 @@ def app():
             )
         st.success(f"Chunks: {len(chunks)}")
 
-        with st.status("Summarizing with Hugging Face...", expanded=False):
+        with st.status("Summarizing chapters...", expanded=False):
             chapters = summarize_chunks(
                 chunks=chunks,
                 video_title=meta.title,
                 model=settings.huggingface_model,
                 huggingface_api_key=settings.huggingface_api_key,
+                max_input_tokens=settings.summary_input_tokens,
+                use_huggingface=settings.summarizer_backend != "openai",
             )
         st.success("Chapters generated")
 
@@ -109,14 +126,14 @@ def app():
         st.download_button(
             "Download JSON",
             data=json.dumps(result_json, ensure_ascii=False, indent=2).encode("utf-8"),
-            file_name=f"{meta.video_id}.summary.json",
+            file_name=f"{meta.video_id}{window_suffix(start, end)}.summary.json",
             mime="application/json",
         )
 
         st.download_button(
             "Download Markdown",
             data=result_md.encode("utf-8"),
-            file_name=f"{meta.video_id}.summary.md",
+            file_name=f"{meta.video_id}{window_suffix(start, end)}.summary.md",
             mime="text/markdown",
         )
 